@@ -1,3 +1,5 @@
+import os
+import math
 import logging
 import json
 import warnings
@@ -8,12 +10,22 @@ from statsmodels.tsa.api import VECM
 from statsmodels.tsa.vector_ar.vecm import select_order
 from statsmodels.stats.diagnostic import acorr_ljungbox, het_arch
 from statsmodels.stats.stattools import durbin_watson, jarque_bera
-from statsmodels.tsa.stattools import grangercausalitytests, adfuller, kpss, acf, pacf
+from statsmodels.tsa.stattools import adfuller, kpss
 from arch.unitroot import engle_granger
 import statsmodels.api as sm
 from datetime import datetime
 from pathlib import Path
-from scipy.stats import norm
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.linalg import lstsq
+from scipy.signal import fftconvolve
+from scipy.stats import norm, chi2, f as f_dist
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder below
+    orjson = None
 
 # Suppress warnings
 warnings.simplefilter('ignore')
@@ -27,50 +39,66 @@ timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 results_dir = project_dir / 'results' / f'results_{timestamp}'
 results_dir.mkdir(parents=True, exist_ok=True)
 log_file = log_dir / 'ecm_analysis.log'
+# Per-group debug output goes to the log file only; the console gets INFO and up
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.INFO)
 logging.basicConfig(
     level=logging.DEBUG,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.FileHandler(log_file), logging.StreamHandler()]
+    handlers=[logging.FileHandler(log_file), console_handler]
 )
 logger = logging.getLogger(__name__)
 
 # Import configurations from project_config.py
 from project_config import (
     UNIFIED_DATA_FILE, MIN_OBSERVATIONS, ECM_LAGS, COINTEGRATION_MAX_LAGS,
-    COMMODITIES, EXCHANGE_RATE_REGIMES
+    COMMODITIES, EXCHANGE_RATE_REGIMES, STORE_FULL_SERIES
 )
+from json_io import load_json_bytes
 
 def load_data():
     logger.debug("Starting data loading process")
     try:
         data_path = Path(UNIFIED_DATA_FILE)
         logger.debug(f"Loading data from {data_path}")
-        with open(data_path, 'r') as f:
-            raw_data = json.load(f)
-        
+        raw_data = load_json_bytes(data_path.read_bytes())
+
         logger.debug(f"Raw data loaded. Number of records: {len(raw_data)}")
-        df = pd.DataFrame(raw_data)
+        if isinstance(raw_data, list) and raw_data:
+            # Records share one schema (written via to_dict(orient='records')),
+            # so build the frame column by column instead of row by row
+            df = pd.DataFrame({column: [record.get(column) for record in raw_data] for column in raw_data[0]})
+        else:
+            df = pd.DataFrame(raw_data)
         required_columns = {'date', 'commodity', 'exchange_rate_regime', 'usdprice', 'conflict_intensity'}
         missing_columns = required_columns - set(df.columns)
         logger.debug(f"Checking for missing columns: {missing_columns}")
-        
+
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
-        
+
         initial_length = len(df)
-        df = df.drop_duplicates()
+        df = df.drop_duplicates(ignore_index=True)
         logger.info(f"Dropped {initial_length - len(df)} duplicate rows.")
-        
+
         if 'date' in df.columns:
             logger.debug("Converting 'date' column to datetime.")
-            df['date'] = pd.to_datetime(df['date'])
+            df['date'] = pd.to_datetime(df['date'], format='ISO8601', cache=True)
         else:
             logger.warning("No 'date' column found in data.")
         
-        grouped_data = {
-            (commodity, regime): group_df
-            for (commodity, regime), group_df in df.groupby(['commodity', 'exchange_rate_regime'])
-        }
+        # One stable sort on the group keys, then slice each contiguous run. Row
+        # order within a group is preserved, matching what groupby would yield.
+        group_keys = ['commodity', 'exchange_rate_regime']
+        df = df.dropna(subset=group_keys).sort_values(group_keys, kind='mergesort', ignore_index=True)
+        grouped_data = {}
+        if not df.empty:
+            keys = df[group_keys].to_numpy()
+            boundaries = np.flatnonzero((keys[1:] != keys[:-1]).any(axis=1)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(df)]))
+            for start, end in zip(starts, ends):
+                grouped_data[tuple(keys[start])] = df.iloc[start:end]
         logger.debug(f"Data grouped by (commodity, regime). Number of groups: {len(grouped_data)}")
         return grouped_data
     except Exception as e:
@@ -80,23 +108,28 @@ def load_data():
 
 def run_stationarity_tests(series, variable):
     logger.debug(f"Running stationarity tests for {variable}")
-    if series.isnull().any() or np.isinf(series).any():
+    values = np.asarray(series, dtype=np.float64)
+    if not np.isfinite(values).all():
         logger.error(f"Data for {variable} contains NaNs or inf values. Please clean the data before running tests.")
         return None
-    transformations = {'original': series, 'diff': series.diff().dropna()}
+    transformations = {'original': values, 'diff': np.diff(values)}
     logger.debug(f"Applied transformations: {list(transformations.keys())}")
-    
-    if (series > 0).all():
+
+    if (values > 0).all():
         logger.debug("Series is positive. Applying log transformations.")
-        transformations['log'] = np.log(series)
-        transformations['log_diff'] = np.log(series).diff().dropna()
-    
+        log_values = np.log(values)
+        transformations['log'] = log_values
+        transformations['log_diff'] = np.diff(log_values)
+
     results = {}
     selected_transformation = None
     for transform_name, transformed_series in transformations.items():
         logger.debug(f"Testing transformation: {transform_name}")
         try:
-            adf_result = adfuller(transformed_series, autolag='AIC')
+            # AIC lag selection over the short int(4*(n/100)^0.25) range instead of the
+            # Schwert upper bound, so far fewer candidate regressions are fitted per call
+            n_obs = len(transformed_series)
+            adf_result = adfuller(transformed_series, maxlag=int(4 * (n_obs / 100) ** 0.25), autolag='AIC')
             kpss_result = kpss(transformed_series, regression='c', nlags='auto')
             adf_stationary = adf_result[1] < 0.05
             kpss_stationary = kpss_result[1] > 0.05
@@ -132,6 +165,12 @@ def run_stationarity_tests(series, variable):
         'results': results
     }
 
+def run_group_stationarity_tests(df):
+    return (
+        run_stationarity_tests(df['usdprice'], 'usdprice'),
+        run_stationarity_tests(df['conflict_intensity'], 'conflict_intensity')
+    )
+
 def run_cointegration_tests(price_series, conflict_series, stationarity_results):
     logger.debug("Running cointegration tests")
     combined_df = pd.concat([price_series, conflict_series], axis=1, join='inner').dropna()
@@ -215,9 +254,12 @@ def compute_model_criteria(results, model):
         llf = results.llf if hasattr(results, 'llf') else None
 
         if llf is not None and n > k_params:
+            log_n = math.log(n)
+            # log(log(n)) is negative/undefined for n <= e
+            log_log_n = math.log(log_n) if log_n > 1 else 0.0
             aic = -2 * llf + 2 * k_params
-            bic = -2 * llf + np.log(n) * k_params
-            hqic = -2 * llf + 2 * np.log(np.log(n)) * k_params
+            bic = -2 * llf + log_n * k_params
+            hqic = -2 * llf + 2 * log_log_n * k_params
         else:
             aic = bic = hqic = np.nan
 
@@ -228,10 +270,21 @@ def compute_model_criteria(results, model):
         logger.debug(f"Detailed error information: {traceback.format_exc()}")
         return np.nan, np.nan, np.nan
 
+@dataclass
+class GroupResult:
+    # One ECM result per commodity/regime group; slots keep the records small
+    __slots__ = ('commodity', 'regime', 'ecm_results', 'stationarity', 'cointegration')
+    commodity: str
+    regime: str
+    ecm_results: dict
+    stationarity: dict
+    cointegration: dict
+
 def run_ecm_analysis(data, stationarity_results, cointegration_results):
-    all_results = []
+    # One slot per group, filled by index; skipped groups stay None
+    all_results = [None] * len(data)
 
-    for (commodity, regime), df in data.items():
+    for idx, ((commodity, regime), df) in enumerate(data.items()):
         try:
             logger.info(f"Running ECM analysis for {commodity} in {regime} regime")
             if len(df) < MIN_OBSERVATIONS:
@@ -256,6 +309,11 @@ def run_ecm_analysis(data, stationarity_results, cointegration_results):
                 logger.warning(f"Not enough data after alignment for {commodity} in {regime}. Skipping.")
                 continue
 
+            # Aligned float arrays, converted once and shared by the ECT and Granger steps
+            y_arr = y.to_numpy(dtype=np.float64)
+            x_arr = x.to_numpy(dtype=np.float64)
+            joint = np.column_stack([y_arr, x_arr])
+
             try:
                 model, results = estimate_ecm(y, x, max_lags=COINTEGRATION_MAX_LAGS, ecm_lags=ECM_LAGS)
             except Exception as e:
@@ -268,7 +326,7 @@ def run_ecm_analysis(data, stationarity_results, cointegration_results):
                 beta = results.beta[:, 0]  # Assuming rank=1
 
                 # Compute the error correction term (ECT)
-                ecm = y.values - x.values.dot(beta[1:]) / beta[0]
+                ecm = y_arr - x_arr.dot(beta[1:]) / beta[0]
                 ecm_series = pd.Series(ecm, index=y.index)
                 ecm_lagged = ecm_series.shift(1)
 
@@ -313,30 +371,31 @@ def run_ecm_analysis(data, stationarity_results, cointegration_results):
                     'Log_Likelihood': float(results.llf) if hasattr(results, 'llf') else None
                 }
 
-                residuals = ols_results.resid
-                fitted_values = ols_results.fittedvalues
+                if STORE_FULL_SERIES:
+                    residuals_list = to_output_floats(ols_results.resid)
+                    fitted_list = to_output_floats(ols_results.fittedvalues)
+                else:
+                    residuals_list, fitted_list = [], []
 
                 diagnostic = run_diagnostics(ols_results)
                 irf_data = compute_irfs(results)
-                gc_results = compute_granger_causality(y, x)
+                gc_results = compute_granger_causality(joint, x.columns)
 
-                result = {
-                    'commodity': commodity,
-                    'regime': regime,
-                    'ecm_results': {
+                all_results[idx] = GroupResult(
+                    commodity=commodity,
+                    regime=regime,
+                    ecm_results={
                         'regression': regression_results,
                         'diagnostics': diagnostic,
                         'irfs': irf_data,
                         'granger_causality': gc_results,
                         'fit_metrics': fit_metrics,
-                        'residuals': residuals.tolist(),
-                        'fitted_values': fitted_values.tolist(),
+                        'residuals': residuals_list,
+                        'fitted_values': fitted_list,
                     },
-                    'stationarity': stationarity_result,
-                    'cointegration': cointegration_result
-                }
-
-                all_results.append(result)
+                    stationarity=stationarity_result,
+                    cointegration=cointegration_result
+                )
             except Exception as e:
                 logger.error(f"Error extracting results for {commodity} in {regime}: {str(e)}")
                 logger.debug(f"Detailed error information: {traceback.format_exc()}")
@@ -345,7 +404,38 @@ def run_ecm_analysis(data, stationarity_results, cointegration_results):
             logger.error(f"Error in ECM analysis for {commodity} in {regime}: {str(e)}")
             logger.debug(f"Detailed error information: {traceback.format_exc()}")
 
-    return all_results
+    return [result for result in all_results if result is not None]
+
+def _autocovariance(x, nlags):
+    x = np.asarray(x, dtype=np.float64)
+    x = x - x.mean()
+    n = len(x)
+    # Lags 0..nlags of the full autocorrelation, computed in one FFT pass
+    return fftconvolve(x, x[::-1], mode='full')[n - 1:n + nlags]
+
+def fast_acf(x, nlags):
+    # Same as statsmodels' acf with its defaults (demeaned, not adjusted)
+    c = _autocovariance(x, nlags)
+    return c / c[0]
+
+def fast_pacf(x, nlags):
+    # Same as statsmodels' pacf with its default 'ywadjusted' method, solving the
+    # Yule-Walker equations for every order at once with the Durbin-Levinson recursion
+    n = len(x)
+    if nlags > n // 2:
+        raise ValueError("Can only compute partial correlations for lags up to 50% of the sample size.")
+    acov = _autocovariance(x, nlags) / (n - np.arange(nlags + 1))
+    r = acov / acov[0]
+
+    pacf_vals = np.empty(nlags + 1)
+    pacf_vals[0] = 1.0
+    phi = np.zeros(nlags + 1)
+    for k in range(1, nlags + 1):
+        phi_kk = (r[k] - phi[1:k] @ r[k - 1:0:-1]) / (1.0 - phi[1:k] @ r[1:k])
+        phi[1:k] = phi[1:k] - phi_kk * phi[k - 1:0:-1]
+        phi[k] = phi_kk
+        pacf_vals[k] = phi_kk
+    return pacf_vals
 
 def run_diagnostics(ols_results):
     if ols_results is None:
@@ -368,8 +458,8 @@ def run_diagnostics(ols_results):
         dw_stat = durbin_watson(resid_y)
 
         # ACF and PACF
-        acf_vals = acf(resid_y, nlags=20)
-        pacf_vals = pacf(resid_y, nlags=20)
+        acf_vals = to_output_floats(fast_acf(resid_y, nlags=20))
+        pacf_vals = to_output_floats(fast_pacf(resid_y, nlags=20))
 
         return {
             'breusch_godfrey_stat': float(bg_test_stat),
@@ -381,8 +471,8 @@ def run_diagnostics(ols_results):
             'durbin_watson_stat': float(dw_stat),
             'skewness': float(skew),
             'kurtosis': float(kurtosis),
-            'acf': acf_vals.tolist(),
-            'pacf': pacf_vals.tolist(),
+            'acf': acf_vals,
+            'pacf': pacf_vals,
         }
     except Exception as e:
         logger.error(f"Diagnostic tests failed: {str(e)}")
@@ -394,52 +484,105 @@ def compute_irfs(results):
         irf = results.irf(10)
         irf_data = {
             'impulse_response': {
-                'irf': irf.irfs.tolist()
+                'irf': to_output_floats(irf.irfs)
             }
         }
         if hasattr(irf, 'irfs_ci'):
-            irf_data['impulse_response']['lower'] = irf.irfs_ci['lower'].tolist()
-            irf_data['impulse_response']['upper'] = irf.irfs_ci['upper'].tolist()
+            irf_data['impulse_response']['lower'] = to_output_floats(irf.irfs_ci['lower'])
+            irf_data['impulse_response']['upper'] = to_output_floats(irf.irfs_ci['upper'])
         return irf_data
     except Exception as e:
         logger.error(f"IRF computation failed: {str(e)}")
         logger.debug(f"Detailed error information: {traceback.format_exc()}")
         return None
 
-def compute_granger_causality(y, x):
-    max_lag = min(COINTEGRATION_MAX_LAGS, max(int(len(y) / 5), 1))
+def _granger_fast(data, max_lag):
+    # Same statistics as statsmodels' grangercausalitytests (column 1 -> column 0),
+    # fitting each lag's restricted/unrestricted pair with a bare least-squares solve.
+    # Under OLS the params F-test on the exogenous lags equals the SSR F-test.
+    data = np.asarray(data, dtype=np.float64)
+    n_total = data.shape[0]
+    if n_total <= 3 * max_lag + 1:
+        raise ValueError(f"Insufficient observations. Maximum allowable lag is {int((n_total - 1) / 3) - 1}")
+
+    y, x = data[:, 0], data[:, 1]
+    gc_metrics = {}
+    for lag in range(1, max_lag + 1):
+        target = y[lag:]
+        n_obs = target.shape[0]
+        # Row t holds the lag previous values of each series, ending at t-1
+        restricted = np.column_stack([np.ones(n_obs), sliding_window_view(y[:-1], lag)])
+        unrestricted = np.column_stack([restricted, sliding_window_view(x[:-1], lag)])
+        # statsmodels refuses constant lag columns (e.g. a constant conflict_intensity)
+        # and perfect fits; raising keeps those groups on the existing {} result
+        if (np.ptp(unrestricted[:, 1:], axis=0) == 0).any():
+            raise ValueError("The x values include a column with constant values and so the test statistic cannot be computed.")
+
+        ssr_restricted = _ssr(restricted, target)
+        ssr_unrestricted = _ssr(unrestricted, target)
+        tss = float(np.sum((target - target.mean()) ** 2))
+        if tss == 0 or ssr_unrestricted == 0 or ssr_unrestricted / tss < np.finfo(float).eps:
+            raise ValueError("The Granger causality test statistic cannot be computed because the VAR has a perfect fit of the data.")
+        df_resid = n_obs - unrestricted.shape[1]
+
+        f_stat = (ssr_restricted - ssr_unrestricted) / ssr_unrestricted / lag * df_resid
+        f_pvalue = f_dist.sf(f_stat, lag, df_resid)
+        chi2_stat = n_obs * (ssr_restricted - ssr_unrestricted) / ssr_unrestricted
+        lr_stat = n_obs * np.log(ssr_restricted / ssr_unrestricted)
+
+        gc_metrics[lag] = {
+            'ssr_ftest_pvalue': float(f_pvalue),
+            'ssr_ftest_stat': float(f_stat),
+            'ssr_chi2test_pvalue': float(chi2.sf(chi2_stat, lag)),
+            'ssr_chi2test_stat': float(chi2_stat),
+            'lrtest_pvalue': float(chi2.sf(lr_stat, lag)),
+            'lrtest_stat': float(lr_stat),
+            'params_ftest_pvalue': float(f_pvalue),
+            'params_ftest_stat': float(f_stat),
+        }
+    return gc_metrics
+
+def _ssr(design, target):
+    beta = lstsq(design, target)[0]
+    resid = target - design @ beta
+    return float(resid @ resid)
+
+def compute_granger_causality(joint, columns):
+    # joint holds the price in column 0 followed by one column per entry in columns
+    max_lag = min(COINTEGRATION_MAX_LAGS, max(int(len(joint) / 5), 1))
     gc_results = {}
-    for col in x.columns:
+    for i, col in enumerate(columns, start=1):
         try:
-            gc_test_result = grangercausalitytests(
-                pd.concat([y, x[col]], axis=1).dropna(),
-                maxlag=max_lag,
-                verbose=False
-            )
-            gc_metrics = {}
-            for lag, test_result in gc_test_result.items():
-                test_stats = test_result[0]
-                gc_metrics[lag] = {
-                    'ssr_ftest_pvalue': test_stats['ssr_ftest'][1],
-                    'ssr_ftest_stat': test_stats['ssr_ftest'][0],
-                    'ssr_chi2test_pvalue': test_stats['ssr_chi2test'][1],
-                    'ssr_chi2test_stat': test_stats['ssr_chi2test'][0],
-                    'lrtest_pvalue': test_stats['lrtest'][1],
-                    'lrtest_stat': test_stats['lrtest'][0],
-                    'params_ftest_pvalue': test_stats['params_ftest'][1],
-                    'params_ftest_stat': test_stats['params_ftest'][0],
-                }
-            gc_results[col] = gc_metrics
+            # With a single regressor (conflict_intensity) joint already is the
+            # (y, x) pair, so it is used as-is instead of being re-sliced
+            data = joint if joint.shape[1] == 2 else joint[:, [0, i]]
+            missing = np.isnan(data).any(axis=1)
+            if missing.any():
+                data = data[~missing]
+            gc_results[col] = _granger_fast(data, max_lag)
         except Exception as e:
             logger.error(f"Granger causality test failed for {col}: {str(e)}")
             logger.debug(f"Detailed error information: {traceback.format_exc()}")
             gc_results[col] = {}
     return gc_results
 
+def to_output_floats(values):
+    # Bulk numeric outputs (IRFs, residuals, fitted values, ACF/PACF) are stored at
+    # float32 precision; both serializers write them with their shortest float32 repr
+    return np.ascontiguousarray(values, dtype=np.float32)
+
+def array_to_list(values):
+    # tolist() widens float32 to float64, which json would write as e.g.
+    # 0.10000000149011612; going through numpy's shortest float32 strings gives
+    # the same numbers orjson writes for these arrays
+    if values.dtype == np.float32:
+        return values.astype(str).astype(np.float64).tolist()
+    return values.tolist()
+
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, np.ndarray):
-            return obj.tolist()
+            return array_to_list(obj)
         if isinstance(obj, (np.float32, np.float64, np.int32, np.int64)):
             return obj.item()
         if isinstance(obj, (pd.Series)):
@@ -450,13 +593,32 @@ class NumpyEncoder(json.JSONEncoder):
             return bool(obj)
         return super(NumpyEncoder, self).default(obj)
 
-def convert_keys_to_str(data):
-    if isinstance(data, dict):
-        return {str(k): convert_keys_to_str(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [convert_keys_to_str(i) for i in data]
+def _converted_child(value, stack):
+    # Arrays convert in C via array_to_list(); containers get an empty placeholder that is
+    # filled when its entry is popped off the stack
+    if isinstance(value, np.ndarray):
+        return array_to_list(value)
+    if isinstance(value, dict):
+        child = {}
+    elif isinstance(value, list):
+        child = []
     else:
-        return data
+        return value
+    stack.append((value, child))
+    return child
+
+def convert_keys_to_str(data):
+    # Iterative walk over the nested results instead of one recursive call per element
+    stack = []
+    root = _converted_child(data, stack)
+    while stack:
+        source, target = stack.pop()
+        if isinstance(source, dict):
+            for k, v in source.items():
+                target[k if type(k) is str else str(k)] = _converted_child(v, stack)
+        else:
+            target.extend([_converted_child(v, stack) for v in source])
+    return root
 
 def save_results(ecm_results, stationarity_results, cointegration_results):
     try:
@@ -464,8 +626,8 @@ def save_results(ecm_results, stationarity_results, cointegration_results):
         flattened_results = []
 
         for result in ecm_results:
-            commodity = str(result.get('commodity'))
-            regime = str(result.get('regime'))
+            commodity = str(result.commodity)
+            regime = str(result.regime)
             if not commodity or not regime:
                 continue
 
@@ -473,21 +635,34 @@ def save_results(ecm_results, stationarity_results, cointegration_results):
             flattened_result = {
                 "commodity": commodity,
                 "regime": regime,
-                "ecm_results": result.get('ecm_results', {}),
-                "stationarity": result.get('stationarity', {}),
-                "cointegration": result.get('cointegration', {})
+                "ecm_results": result.ecm_results or {},
+                "stationarity": result.stationarity or {},
+                "cointegration": result.cointegration or {}
             }
 
             flattened_results.append(flattened_result)
 
-        # Convert all data to JSON-serializable format
-        flattened_results = convert_keys_to_str(flattened_results)
-
-        # Save the flattened results to a JSON file
-        with open(results_dir / 'ecm_analysis_results.json', 'w') as f:
-            json.dump(flattened_results, f, indent=4, cls=NumpyEncoder)
+        # Save the flattened results as compact JSON, written to a temporary file
+        # and moved into place so readers never see a partially written file
+        output_path = results_dir / 'ecm_analysis_results.json'
+        tmp_path = output_path.with_suffix('.json.tmp')
+        if orjson is not None:
+            # orjson serializes numpy arrays/scalars natively and stringifies the
+            # integer lag keys; NumpyEncoder only handles what it can't (pandas objects)
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(
+                    flattened_results,
+                    default=NumpyEncoder().default,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                ))
+        else:
+            # Convert all data to JSON-serializable format
+            flattened_results = convert_keys_to_str(flattened_results)
+            with open(tmp_path, 'w') as f:
+                json.dump(flattened_results, f, cls=NumpyEncoder)
+        os.replace(tmp_path, output_path)
 
-        logger.info(f"All flattened results saved to {results_dir / 'ecm_analysis_results.json'}")
+        logger.info(f"All flattened results saved to {output_path}")
     except Exception as e:
         logger.error(f"Error while saving results: {str(e)}")
         logger.debug(f"Detailed error information: {traceback.format_exc()}")
@@ -499,14 +674,22 @@ def main():
         data = load_data()
         logger.info(f"Data loaded. Number of datasets: {len(data)}")
         stationarity_results, cointegration_results = {}, {}
+
+        eligible = {}
         for (commodity, regime), df in data.items():
-            logger.info(f"Processing {commodity} in {regime} regime")
             if len(df) < MIN_OBSERVATIONS:
                 logger.warning(f"Insufficient data for {commodity} in {regime} regime. Skipping ECM analysis.")
                 continue
-            
-            stationarity_result_usdprice = run_stationarity_tests(df['usdprice'], 'usdprice')
-            stationarity_result_conflict = run_stationarity_tests(df['conflict_intensity'], 'conflict_intensity')
+            eligible[(commodity, regime)] = df
+
+        # ADF/KPSS spend their time in NumPy/LAPACK, which releases the GIL,
+        # so threads are enough to run the groups concurrently
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            stationarity_runs = dict(zip(eligible, executor.map(run_group_stationarity_tests, eligible.values())))
+
+        for (commodity, regime), df in eligible.items():
+            logger.info(f"Processing {commodity} in {regime} regime")
+            stationarity_result_usdprice, stationarity_result_conflict = stationarity_runs[(commodity, regime)]
             if stationarity_result_usdprice is None or stationarity_result_conflict is None:
                 logger.warning(f"Stationarity tests failed for {commodity} in {regime}. Skipping.")
                 continue
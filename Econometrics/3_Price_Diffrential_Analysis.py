@@ -3,10 +3,9 @@ import pandas as pd
 import numpy as np
 from statsmodels.tsa.stattools import adfuller, kpss
 from statsmodels.stats.outliers_influence import variance_inflation_factor
-from statsmodels.stats.diagnostic import het_breuschpagan
 from statsmodels.stats.stattools import durbin_watson
 import statsmodels.api as sm
-from scipy.stats import pearsonr, jarque_bera
+from scipy.stats import pearsonr, jarque_bera, chi2
 import logging
 from pathlib import Path
 import multiprocessing as mp
@@ -152,6 +151,17 @@ def handle_high_vif(X, threshold=10):
     
     return X
 
+def breusch_pagan_test(resid, exog):
+    """Koenker's studentized Breusch-Pagan LM test (statsmodels' het_breuschpagan default)."""
+    u2 = np.asarray(resid, dtype=np.float64) ** 2
+    exog = np.asarray(exog, dtype=np.float64)
+    nobs, nvars = exog.shape
+    beta, *_ = np.linalg.lstsq(exog, u2, rcond=None)
+    ssr = np.sum((u2 - exog @ beta) ** 2)
+    centered_tss = np.sum((u2 - u2.mean()) ** 2)
+    lm = nobs * (1 - ssr / centered_tss)
+    return lm, chi2.sf(lm, nvars - 1)
+
 def run_price_differential_model(data):
     """Run the price differential model using Feasible Generalized Least Squares (FGLS)."""
     try:
@@ -188,7 +198,7 @@ def run_price_differential_model(data):
         vif = calculate_vif(X)
         
         # Perform diagnostic tests
-        bp_test = het_breuschpagan(fgls_model.resid, fgls_model.model.exog)
+        bp_test = breusch_pagan_test(fgls_model.resid, fgls_model.model.exog)
         dw_statistic = durbin_watson(fgls_model.resid)
         
         # Perform Ramsey RESET test
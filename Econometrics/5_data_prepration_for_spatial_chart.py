@@ -1,13 +1,37 @@
 import os
+from itertools import chain
 import json
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 import geopandas as gpd
 from pathlib import Path
-from libpysal.weights import KNN
+from libpysal.weights import W
+from libpysal.weights.util import get_points_array
+from scipy.spatial import cKDTree
 from esda.moran import Moran
 import logging
-import networkx as nx  # For connectivity checks
-from libpysal.weights.spatial_lag import lag_spatial
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components  # For connectivity checks
+from scipy.cluster.hierarchy import DisjointSet
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json module
+    orjson = None
+
+try:
+    import pyogrio  # GDAL-backed vectorized GeoJSON I/O
+except ImportError:  # fall back to geopandas' default (Fiona) engine
+    pyogrio = None
+
+try:
+    import pyarrow  # lets pyogrio hand records over as Arrow batches
+except ImportError:
+    pyarrow = None
+
+from csv_export import write_csv
+from json_io import load_json_bytes
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -30,14 +54,27 @@ for directory in [CHOROPLETH_OUTPUT_DIR, WEIGHTS_OUTPUT_DIR, TIME_SERIES_OUTPUT_
 
 def load_model_results(file_path):
     """Load model results from JSON file."""
-    with open(file_path, 'r') as f:
-        results = json.load(f)
+    results = load_json_bytes(Path(file_path).read_bytes())
     logger.info(f"Loaded model results from {file_path}")
     return results
 
+def resolve_geojson_source(file_path):
+    """Prefer an up-to-date newline-delimited (GeoJSONSeq) copy of the GeoJSON if one exists."""
+    file_path = Path(file_path)
+    lines_path = file_path.with_suffix('.geojsonl')
+    if lines_path.exists() and (not file_path.exists() or lines_path.stat().st_mtime >= file_path.stat().st_mtime):
+        return lines_path
+    return file_path
+
 def load_geojson_data(file_path):
     """Load GeoJSON data and apply consistent sorting."""
-    gdf = gpd.read_file(file_path)
+    # GDAL picks the GeoJSONSeq driver from the .geojsonl suffix, which streams one
+    # feature per line instead of parsing the whole FeatureCollection at once
+    file_path = resolve_geojson_source(file_path)
+    if pyogrio is not None:
+        gdf = pyogrio.read_dataframe(file_path, use_arrow=pyarrow is not None)
+    else:
+        gdf = gpd.read_file(file_path)
     logger.info(f"Loaded GeoJSON data from {file_path} with {len(gdf)} records")
     
     # Log GeoDataFrame columns for debugging
@@ -47,7 +84,7 @@ def load_geojson_data(file_path):
     gdf['date'] = pd.to_datetime(gdf['date'], errors='coerce')
     
     # Apply consistent sorting by region_id, date, commodity, exchange_rate_regime
-    gdf = gdf.sort_values(by=['region_id', 'date', 'commodity', 'exchange_rate_regime']).reset_index(drop=True)
+    gdf = gdf.sort_values(by=['region_id', 'date', 'commodity', 'exchange_rate_regime'], ignore_index=True)
     return gdf
 
 def check_unique_identifier(gdf, identifier='region_id'):
@@ -69,47 +106,56 @@ def prepare_unique_regions_gdf(gdf, identifier='region_id'):
     logger.info(f"Created unique regions GeoDataFrame with {len(unique_regions_gdf)} records based on '{identifier}'.")
     return unique_regions_gdf
 
-def is_fully_connected(w):
-    """
-    Check if the spatial weights matrix is fully connected.
-    """
-    try:
-        G = w.to_networkx()
-        G_undirected = G.to_undirected()
-        return nx.is_connected(G_undirected)
-    except Exception as e:
-        logger.error(f"Error checking connectivity: {e}")
-        return False
-
-def inspect_neighbors(w, unique_gdf, sample_size=5):
+def verify_spatial_weights(w, unique_gdf, sample_size=5):
     """
-    Inspect a sample of neighbors to ensure no region includes itself.
+    Verify that no region includes itself as a neighbor and log a sample of neighbor lists.
     """
     region_ids = unique_gdf['region_id'].tolist()
-    sample_indices = range(min(sample_size, len(region_ids)))
 
-    for idx in sample_indices:
-        region = region_ids[idx]
-        neighbors = [region_ids[n] for n in w.neighbors[idx]]
-        if region in neighbors:
-            logger.warning(f"Region '{region}' includes itself as a neighbor.")
-        else:
-            logger.info(f"Region '{region}' neighbors: {neighbors}")
+    self_neighbors = [region_ids[idx] for idx, neighbors in w.neighbors.items() if idx in neighbors]
+    if self_neighbors:
+        logger.error(f"Regions including themselves as a neighbor: {self_neighbors}")
 
-def verify_spatial_weights(w, unique_gdf, sample_size=5):
+    for idx in range(min(sample_size, len(region_ids))):
+        logger.info(f"Region '{region_ids[idx]}' neighbors: {[region_ids[n] for n in w.neighbors[idx]]}")
+
+def knn_neighbor_table(unique_gdf, max_k):
     """
-    Verify that no region includes itself as a neighbor and that neighbors are distinct.
+    Query the max_k nearest neighbors of every region once.
+    Row i lists region i's neighbors by distance (self excluded), so the first k
+    columns are the k-nearest-neighbor set for any k <= max_k.
     """
-    region_ids = unique_gdf['region_id'].tolist()
-    sample_indices = range(min(sample_size, len(region_ids)))
-
-    for idx in sample_indices:
-        region = region_ids[idx]
-        neighbors = [region_ids[n] for n in w.neighbors[idx]]
-        if region in neighbors:
-            logger.error(f"Region '{region}' includes itself as a neighbor.")
-        else:
-            logger.info(f"Region '{region}' neighbors: {neighbors}")
+    coords = get_points_array(unique_gdf.geometry)
+    n = len(coords)
+    max_k = min(max_k, n - 1)
+    _, nearest = cKDTree(coords).query(coords, k=max_k + 1)
+    nearest = np.asarray(nearest).reshape(n, max_k + 1)
+    # Self is normally the first hit, but co-located points can push it further
+    # down (or out of) the row, so it is removed by value
+    return np.array([row[row != i][:max_k] for i, row in enumerate(nearest)], dtype=int).reshape(n, max_k)
+
+def minimum_connected_k(nearest, initial_k):
+    """
+    Find the smallest k >= initial_k for which the KNN graph is connected, or None.
+    The components of the initial_k graph seed a union-find; each further k only adds
+    every region's k-th neighbor edge instead of re-checking the whole graph.
+    """
+    n, max_k = nearest.shape
+    if initial_k > max_k:
+        return None
+    rows = np.repeat(np.arange(n), initial_k)
+    adjacency = csr_matrix((np.ones(len(rows)), (rows, nearest[:, :initial_k].ravel())), shape=(n, n))
+    n_components, labels = connected_components(adjacency, directed=False)
+    if n_components == 1:
+        return initial_k
+
+    components = DisjointSet(range(n_components))
+    for k in range(initial_k + 1, max_k + 1):
+        for source, target in zip(labels.tolist(), labels[nearest[:, k - 1]].tolist()):
+            components.merge(source, target)
+        if components.n_subsets == 1:
+            return k
+    return None
 
 def export_spatial_weights(unique_gdf, initial_k=5, max_k=20, identifier='region_id'):
     """
@@ -119,47 +165,33 @@ def export_spatial_weights(unique_gdf, initial_k=5, max_k=20, identifier='region
         # Ensure the GeoDataFrame is sorted by the identifier for consistent indexing
         unique_gdf = unique_gdf.sort_values(by=[identifier]).reset_index(drop=True)
         region_ids = unique_gdf[identifier].tolist()
-        k = initial_k
-
-        while k <= max_k:
-            logger.info(f"Attempting to create KNN weights with k={k}...")
-            w = KNN.from_dataframe(unique_gdf, k=k)
-            
-            logger.info("Checking if the weights matrix is fully connected...")
-            if is_fully_connected(w):
-                logger.info(f"Spatial weights matrix is fully connected with k={k}.")
-                break
-            else:
-                logger.warning(f"Spatial weights matrix is NOT fully connected with k={k}.")
-                k += 1
+        # One KD-tree query at max_k; each smaller k is a prefix of it
+        nearest = knn_neighbor_table(unique_gdf, max_k)
+        max_k = nearest.shape[1]
 
-        if k > max_k:
+        k = minimum_connected_k(nearest, initial_k)
+        if k is not None:
+            logger.info(f"Spatial weights matrix is fully connected with k={k}.")
+        else:
             logger.error(f"Failed to create a fully connected spatial weights matrix with k up to {max_k}.")
-            k_final = k-1
-            logger.warning(f"Proceeding with k={k_final} which may have disconnected components.")
-            w = KNN.from_dataframe(unique_gdf, k=k_final)
-
-        neighbors_dict = w.neighbors
-        weights_dict = {}
-
-        for region_idx, neighbors in neighbors_dict.items():
-            if region_idx >= len(region_ids):
-                logger.error(f"Region index {region_idx} exceeds the number of unique regions.")
-                continue
-            
-            region = region_ids[region_idx]
-            neighbor_regions = [region_ids[n] for n in neighbors if n != region_idx and n < len(region_ids)]
-
-            if not neighbor_regions:
-                logger.warning(f"Region '{region}' has no valid neighbors.")
-            else:
-                weights_dict[region] = neighbor_regions
-
-        with open(WEIGHTS_OUTPUT_DIR / "spatial_weights.json", 'w') as f:
-            json.dump(weights_dict, f, indent=2)
+            k = max_k
+            logger.warning(f"Proceeding with k={k} which may have disconnected components.")
+        w = W({i: nearest[i, :k].tolist() for i in range(len(nearest))})
+
+        # Neighbor positions index region_ids directly; self is already excluded
+        weights_dict = {region_ids[i]: [region_ids[n] for n in neighbors] for i, neighbors in w.neighbors.items()}
+        for region in [region for region, neighbors in weights_dict.items() if not neighbors]:
+            logger.warning(f"Region '{region}' has no valid neighbors.")
+            del weights_dict[region]
+
+        if orjson is not None:
+            with open(WEIGHTS_OUTPUT_DIR / "spatial_weights.json", 'wb') as f:
+                f.write(orjson.dumps(weights_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(WEIGHTS_OUTPUT_DIR / "spatial_weights.json", 'w') as f:
+                json.dump(weights_dict, f, indent=2)
 
         logger.info("Spatial weights matrix exported to JSON.")
-        inspect_neighbors(w, unique_gdf)
         verify_spatial_weights(w, unique_gdf)
 
         return w
@@ -167,16 +199,65 @@ def export_spatial_weights(unique_gdf, initial_k=5, max_k=20, identifier='region
         logger.error(f"Failed to export spatial weights matrix: {e}")
         raise
 
+def build_residuals_frame(model_results):
+    """
+    Flatten the residual entries of all model results into one DataFrame.
+    """
+    rows = []
+    for result in model_results:
+        commodity = result.get('commodity', 'Unknown Commodity')
+        regime = result.get('regime', 'Unknown Regime')  # Changed 'exchange_rate_regime' to 'regime'
+        for res in result.get('residuals', []):
+            if 'residual' in res:
+                rows.append((commodity, regime, res['region_id'], res['date'], res['residual']))
+            else:
+                logger.warning(f"Missing 'residual' in residual entry: {res}")
+    residuals_df = pd.DataFrame(rows, columns=['commodity', 'regime', 'region_id', 'date', 'residual'])
+    # Parse all dates in one vectorized call
+    residuals_df['date'] = pd.to_datetime(residuals_df['date'], errors='coerce')
+    return residuals_df
+
+def region_pct_change(df_sorted):
+    """
+    Percentage change in usdprice from the previous row of the same region.
+    Expects rows sorted by region_id (then date), so each region is one contiguous run;
+    equivalent to groupby('region_id')['usdprice'].pct_change() * 100.
+    """
+    prices = df_sorted['usdprice'].to_numpy(dtype=np.float64)
+    region_ids = df_sorted['region_id'].to_numpy()
+    previous = np.empty_like(prices)
+    previous[:1] = np.nan
+    previous[1:] = prices[:-1]
+    # The first row of each region (and rows without a region) has no predecessor
+    previous[1:][region_ids[1:] != region_ids[:-1]] = np.nan
+    previous[df_sorted['region_id'].isna().to_numpy()] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (prices / previous - 1) * 100
+
 def prepare_choropleth_data(gdf, model_results):
     """
     Prepare data for choropleth maps: Average prices, Conflict intensity, Price changes, Residuals.
+    Returns the conflict intensity per region and date for reuse by prepare_time_series_data.
     """
     try:
         # Ensure 'date' is in datetime format
         gdf['date'] = pd.to_datetime(gdf['date'], errors='coerce')
-        
+        # Aggregate on a plain DataFrame so the groupbys never carry the geometry column
+        df = pd.DataFrame(gdf.drop(columns=gdf.geometry.name)).sort_values(['region_id', 'date'])
+        df['price_change_pct'] = region_pct_change(df)
+
+        # One groupby pass for all per-region/date means
+        region_means = df.groupby(['region_id', 'date'])[['usdprice', 'conflict_intensity', 'price_change_pct']].mean()
+    except Exception as e:
+        logger.error(f"Failed to aggregate choropleth data: {e}")
+        raise
+
+    avg_prices = region_means['usdprice'].reset_index().rename(columns={'usdprice': 'avg_usdprice'})
+    conflict_intensity = region_means['conflict_intensity'].reset_index().rename(columns={'conflict_intensity': 'avg_conflict_intensity'})
+    price_changes = region_means['price_change_pct'].reset_index()
+
+    try:
         # 1. Average Prices per Region and Time
-        avg_prices = gdf.groupby(['region_id', 'date'])['usdprice'].mean().reset_index().rename(columns={'usdprice': 'avg_usdprice'})
         avg_prices.to_csv(CHOROPLETH_OUTPUT_DIR / "average_prices.csv", index=False)
         logger.info("Prepared average prices for choropleth maps.")
     except Exception as e:
@@ -185,7 +266,6 @@ def prepare_choropleth_data(gdf, model_results):
 
     try:
         # 2. Conflict Intensity per Region and Time
-        conflict_intensity = gdf.groupby(['region_id', 'date'])['conflict_intensity'].mean().reset_index().rename(columns={'conflict_intensity': 'avg_conflict_intensity'})
         conflict_intensity.to_csv(CHOROPLETH_OUTPUT_DIR / "conflict_intensity.csv", index=False)
         logger.info("Prepared conflict intensity for choropleth maps.")
     except Exception as e:
@@ -194,9 +274,6 @@ def prepare_choropleth_data(gdf, model_results):
 
     try:
         # 3. Price Changes per Region and Time
-        gdf_sorted = gdf.sort_values(['region_id', 'date'])
-        gdf_sorted['price_change_pct'] = gdf_sorted.groupby('region_id')['usdprice'].pct_change() * 100
-        price_changes = gdf_sorted.groupby(['region_id', 'date'])['price_change_pct'].mean().reset_index()
         price_changes.to_csv(CHOROPLETH_OUTPUT_DIR / "price_changes.csv", index=False)
         logger.info("Prepared price changes for choropleth maps.")
     except Exception as e:
@@ -205,42 +282,52 @@ def prepare_choropleth_data(gdf, model_results):
 
     try:
         # 4. Model Residuals per Region, Commodity, Regime, and Time
-        residuals_list = []
-        for result in model_results:
-            commodity = result.get('commodity', 'Unknown Commodity')
-            regime = result.get('regime', 'Unknown Regime')  # Changed 'exchange_rate_regime' to 'regime'
-            residuals = result.get('residuals', [])
-            for res in residuals:
-                if 'residual' in res:
-                    residuals_list.append({
-                        'commodity': commodity,
-                        'regime': regime,
-                        'region_id': res['region_id'],
-                        'date': pd.to_datetime(res['date'], errors='coerce'),
-                        'residual': res['residual']
-                    })
-                else:
-                    logger.warning(f"Missing 'residual' in residual entry: {res}")
-        residuals_df = pd.DataFrame(residuals_list)
-        residuals_df.to_csv(CHOROPLETH_OUTPUT_DIR / "residuals.csv", index=False)
+        residuals_df = build_residuals_frame(model_results)
+        write_csv(residuals_df, CHOROPLETH_OUTPUT_DIR / "residuals.csv")
         logger.info("Prepared residuals for choropleth maps.")
     except Exception as e:
         logger.error(f"Failed to prepare residuals: {e}")
         raise
 
-def prepare_time_series_data(gdf):
+    return conflict_intensity
+
+def pivot_prices(df):
     """
-    Prepare time series data for prices and conflict intensity.
+    Wide usdprice table indexed by (region_id, date) with a column per (commodity, regime).
     """
+    keys = ['region_id', 'date', 'commodity', 'exchange_rate_regime']
     try:
-        gdf = gdf.sort_values(by=['region_id', 'date', 'commodity', 'exchange_rate_regime']).reset_index(drop=True)
-        
-        # Time series per Commodity and Exchange Rate Regime
-        prices_ts = gdf.pivot_table(
+        # Each key combination normally occurs once, so a plain reshape suffices;
+        # rows, columns and NaN handling match pivot_table's defaults
+        prices_ts = (
+            df.dropna(subset=keys)
+            .set_index(keys)['usdprice']
+            .unstack(['commodity', 'exchange_rate_regime'])
+            .dropna(how='all')
+            .dropna(axis=1, how='all')
+            .sort_index(axis=1)
+        )
+        # unstack keeps the keys' integer dtype where there are no gaps; pivot_table always returns floats
+        return prices_ts.astype(np.float64)
+    except ValueError:
+        # Duplicate entries: fall back to averaging them
+        return df.pivot_table(
             index=['region_id', 'date'], 
             columns=['commodity', 'exchange_rate_regime'], 
             values='usdprice'
-        ).reset_index()
+        )
+
+def prepare_time_series_data(gdf, conflict_intensity=None):
+    """
+    Prepare time series data for prices and conflict intensity.
+    conflict_intensity can pass in the per-region/date means already computed by prepare_choropleth_data.
+    """
+    # gdf is already sorted by region_id, date, commodity, exchange_rate_regime in load_geojson_data
+    df = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+
+    try:
+        # Time series per Commodity and Exchange Rate Regime
+        prices_ts = pivot_prices(df).reset_index()
         prices_ts.to_csv(TIME_SERIES_OUTPUT_DIR / "prices_time_series.csv", index=False)
         logger.info("Prepared and saved time series data for prices.")
     except Exception as e:
@@ -249,7 +336,10 @@ def prepare_time_series_data(gdf):
 
     try:
         # Conflict Intensity Time Series
-        conflict_ts = gdf.groupby(['region_id', 'date'])['conflict_intensity'].mean().reset_index().rename(columns={'conflict_intensity': 'avg_conflict_intensity'})
+        if conflict_intensity is not None:
+            conflict_ts = conflict_intensity
+        else:
+            conflict_ts = df.groupby(['region_id', 'date'])['conflict_intensity'].mean().reset_index().rename(columns={'conflict_intensity': 'avg_conflict_intensity'})
         conflict_ts.to_csv(TIME_SERIES_OUTPUT_DIR / "conflict_intensity_time_series.csv", index=False)
         logger.info("Prepared and saved time series data for conflict intensity.")
     except Exception as e:
@@ -261,80 +351,78 @@ def export_residuals(model_results):
     Export residuals data.
     """
     try:
-        residuals_list = []
-        for result in model_results:
-            commodity = result.get('commodity', 'Unknown Commodity')
-            regime = result.get('regime', 'Unknown Regime')  # Changed 'exchange_rate_regime' to 'regime'
-            residuals = result.get('residuals', [])
-            for res in residuals:
-                if 'residual' in res:
-                    residuals_list.append({
-                        'commodity': commodity,
-                        'regime': regime,
-                        'region_id': res['region_id'],
-                        'date': pd.to_datetime(res['date'], errors='coerce'),
-                        'residual': res['residual']
-                    })
-                else:
-                    logger.warning(f"Missing 'residual' in residual entry: {res}")
-        residuals_df = pd.DataFrame(residuals_list)
-        residuals_df.to_csv(RESIDUALS_OUTPUT_DIR / "residuals.csv", index=False)
+        residuals_df = build_residuals_frame(model_results)
+        write_csv(residuals_df, RESIDUALS_OUTPUT_DIR / "residuals.csv")
         logger.info("Exported residuals data.")
+        return residuals_df
     except Exception as e:
         logger.error(f"Failed to export residuals data: {e}")
         raise
 
 def generate_network_data(gdf, unique_regions_gdf, w):
     """Generate flow maps using the spatial weights matrix and include latitude/longitude."""
-    flow_data = []
     try:
         # Get the list of region_ids based on the order in w
         region_ids_in_order = unique_regions_gdf['region_id'].tolist()
 
-        # Map the id_order (numerical index) from w to the corresponding region_ids
-        id_to_region_map = {i: region for i, region in enumerate(region_ids_in_order)}
-
-        # Extract latitude and longitude from unique_regions_gdf
-        unique_gdf = unique_regions_gdf.copy()
-        unique_gdf['latitude'] = unique_gdf['latitude']
-        unique_gdf['longitude'] = unique_gdf['longitude']
+        # Coordinates as arrays indexed by the same positions as w
+        latitudes = unique_regions_gdf['latitude'].to_numpy()
+        longitudes = unique_regions_gdf['longitude'].to_numpy()
 
         # Calculate average usdprice per region
         usdprice_avg = gdf.groupby('region_id')['usdprice'].mean().reindex(region_ids_in_order).fillna(0)
-        unique_gdf['avg_usdprice'] = usdprice_avg.values
-
-        # Calculate spatial lag
-        unique_gdf['spatial_lag_usdprice'] = lag_spatial(w, unique_gdf['avg_usdprice'])
-
-        for idx, source_id in enumerate(w.id_order):
-            source = id_to_region_map[idx]
-            neighbors = w.neighbors[idx]
-            for neighbor_idx in neighbors:
-                target = id_to_region_map[neighbor_idx]
-                weight = unique_gdf.loc[idx, 'spatial_lag_usdprice']  # Adjusted to use 'avg_usdprice'
-
-                # Retrieve latitude and longitude for both source and target from the unique GeoDataFrame
-                source_coords = unique_gdf.loc[idx, ['latitude', 'longitude']].values
-                target_coords = unique_gdf.loc[neighbor_idx, ['latitude', 'longitude']].values
-
-                flow_data.append({
-                    'source': source,
-                    'source_lat': source_coords[0],
-                    'source_lng': source_coords[1],
-                    'target': target,
-                    'target_lat': target_coords[0],
-                    'target_lng': target_coords[1],
-                    'weight': weight
-                })
+
+        # Calculate spatial lag (sparse matrix-vector product, as lag_spatial does,
+        # under the weights' current transform)
+        spatial_lag = w.sparse @ usdprice_avg.to_numpy(dtype=np.float64)
+
+        # Edge list as position arrays: each source repeated once per neighbor, targets
+        # in w's neighbor order; every column is then gathered by fancy indexing
+        neighbor_lists = [w.neighbors[idx] for idx in range(len(w.id_order))]
+        counts = np.fromiter((len(neighbors) for neighbors in neighbor_lists), dtype=np.intp, count=len(neighbor_lists))
+        source_idx = np.repeat(np.arange(len(neighbor_lists)), counts)
+        target_idx = np.fromiter(chain.from_iterable(neighbor_lists), dtype=np.intp, count=counts.sum())
+        region_ids = np.asarray(region_ids_in_order, dtype=object)
 
         # Create a DataFrame from the flow data and save it to CSV
-        flow_df = pd.DataFrame(flow_data)
+        flow_df = pd.DataFrame({
+            'source': region_ids[source_idx],
+            'source_lat': latitudes[source_idx],
+            'source_lng': longitudes[source_idx],
+            'target': region_ids[target_idx],
+            'target_lat': latitudes[target_idx],
+            'target_lng': longitudes[target_idx],
+            'weight': spatial_lag[source_idx]
+        })
         flow_df.to_csv(NETWORK_DATA_OUTPUT_DIR / "flow_maps.csv", index=False)
         logger.info("Generated and saved flow maps data with coordinates for network graphs.")
     except Exception as e:
         logger.error(f"Failed to generate network data: {e}")
         raise
 
+def merge_on_category_codes(left, right, on, how):
+    """
+    Merge two frames, joining string key columns on shared categorical codes.
+    """
+    left = left.copy(deep=False)
+    right = right.copy(deep=False)
+    original_dtypes = {}
+    for key in on:
+        if left[key].dtype != right[key].dtype or not pd.api.types.is_string_dtype(left[key].dtype):
+            continue
+        # Both sides get the same categories, so the join hashes integer codes
+        categories = union_categoricals(
+            [left[key].astype('category'), right[key].astype('category')], ignore_order=True
+        ).categories
+        original_dtypes[key] = left[key].dtype
+        left[key] = pd.Categorical(left[key], categories=categories)
+        right[key] = pd.Categorical(right[key], categories=categories)
+
+    merged = left.merge(right, on=on, how=how)
+    for key, dtype in original_dtypes.items():
+        merged[key] = merged[key].astype(dtype)
+    return merged
+
 def merge_residuals_with_geojson(gdf, residuals_df):
     """
     Merge residuals into GeoDataFrame based on region_id, date, commodity, and regime.
@@ -343,13 +431,14 @@ def merge_residuals_with_geojson(gdf, residuals_df):
         # Ensure 'date' in residuals_df is datetime
         residuals_df['date'] = pd.to_datetime(residuals_df['date'], errors='coerce')
         
-        # Extract relevant fields for merging
-        geo_df = gdf.copy()
+        # Shallow copy: only a column is added, so the geometries need not be duplicated
+        geo_df = gdf.copy(deep=False)
         # 'regime' is actually 'exchange_rate_regime'
         geo_df['regime'] = geo_df['exchange_rate_regime']
         
         # Merge residuals
-        merged_df = geo_df.merge(
+        merged_df = merge_on_category_codes(
+            geo_df,
             residuals_df,
             on=['region_id', 'date', 'commodity', 'regime'],
             how='left'
@@ -360,7 +449,10 @@ def merge_residuals_with_geojson(gdf, residuals_df):
 
         # Save the enhanced GeoJSON
         enhanced_geojson_path = RESULTS_DIR / "enhanced_unified_data_with_residuals.geojson"
-        merged_df.to_file(enhanced_geojson_path, driver='GeoJSON')
+        if pyogrio is not None:
+            pyogrio.write_dataframe(merged_df, enhanced_geojson_path, driver='GeoJSON')
+        else:
+            merged_df.to_file(enhanced_geojson_path, driver='GeoJSON')
         logger.info(f"Enhanced GeoJSON with residuals saved to {enhanced_geojson_path}")
     except Exception as e:
         logger.error(f"Failed to merge residuals with GeoJSON: {e}")
@@ -382,21 +474,19 @@ def main():
     model_results = load_model_results(MODEL_RESULTS_FILE)
 
     # Prepare and export choropleth data
-    prepare_choropleth_data(gdf, model_results)
+    conflict_intensity = prepare_choropleth_data(gdf, model_results)
 
     # Export spatial weights matrix with dynamic k on unique regions
     w = export_spatial_weights(unique_regions_gdf, initial_k=5, max_k=20, identifier='region_id')
 
     # Prepare and export time series data
-    prepare_time_series_data(gdf)
+    prepare_time_series_data(gdf, conflict_intensity)
 
     # Export residuals data
-    export_residuals(model_results)
+    residuals_df = export_residuals(model_results)
 
     # Merge residuals with GeoJSON and save enhanced GeoJSON
-    # Load the residuals CSV for merging
-    residuals_csv_path = RESIDUALS_OUTPUT_DIR / "residuals.csv"
-    residuals_df = pd.read_csv(residuals_csv_path)
+    # (uses the in-memory residuals rather than re-reading the exported CSV)
     merge_residuals_with_geojson(gdf, residuals_df)
 
     # Generate and export network data for flow maps
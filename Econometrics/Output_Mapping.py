@@ -1,12 +1,46 @@
 import json
 import csv
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
+try:
+    import ijson  # incremental parser; lets a top-level array be sampled without loading it
+except ImportError:
+    ijson = None
+
+try:
+    import pyarrow.csv as pacsv  # reads the header and first block with type inference
+except ImportError:  # fall back to the csv module
+    pacsv = None
+
+from json_io import load_json_bytes
+
 # Set the root directory as one level above the script
 root_dir = Path(__file__).resolve().parent.parent
 results_dir = root_dir / "results"
 
+def load_json(file_path):
+    return load_json_bytes(Path(file_path).read_bytes())
+
+def load_json_sample(file_path):
+    # map_json_structure only looks at the first element of a list, so a top-level
+    # array is read up to its first item instead of being loaded whole
+    if ijson is not None:
+        with open(file_path, 'rb') as f:
+            first_char = f.read(1)
+            while first_char.isspace():
+                first_char = f.read(1)
+            if first_char == b'[':
+                f.seek(0)
+                try:
+                    first_item = next(iter(ijson.items(f, 'item', use_float=True)), None)
+                except ijson.JSONError:
+                    # e.g. NaN/Infinity tokens; the full load below accepts those
+                    return load_json(file_path)
+                return [] if first_item is None else [first_item]
+    return load_json(file_path)
+
 def map_json_structure(data, prefix=''):
     structure = {}
     if isinstance(data, dict):
@@ -20,6 +54,20 @@ def map_json_structure(data, prefix=''):
     return structure
 
 def map_csv_structure(file_path):
+    if pacsv is not None:
+        # Only the first block is parsed; column types are inferred from its values
+        reader = pacsv.open_csv(file_path)
+        schema = reader.schema
+        try:
+            first_batch = reader.read_next_batch()
+        except StopIteration:
+            first_batch = None
+        finally:
+            reader.close()
+        if first_batch is None or first_batch.num_rows == 0:
+            return {name: "Unknown" for name in schema.names}
+        return {field.name: str(field.type) for field in schema}
+
     with open(file_path, 'r') as csvfile:
         reader = csv.reader(csvfile)
         headers = next(reader)
@@ -34,47 +82,48 @@ def map_csv_structure(file_path):
     
     return structure
 
+def map_json_file(file_path):
+    return map_json_structure(load_json_sample(file_path))
+
 def map_outputs():
     results_dir = Path("results")
-    output_mapping = {}
+    # (mapping key, mapper, file path) in output order
+    tasks = []
 
     # ECM Analysis outputs
     ecm_files = ['ecm_results.json', 'ecm_diagnostics.json', 'stationarity_results.json', 'cointegration_results.json']
     for file in ecm_files:
-        with open(results_dir / file, 'r') as f:
-            data = json.load(f)
-            output_mapping[file] = map_json_structure(data)
+        tasks.append((file, map_json_file, results_dir / file))
 
     # Price Differential Analysis outputs
     price_diff_dir = results_dir / "price_differential"
     for file in price_diff_dir.glob("price_differential_results_*.json"):
-        with open(file, 'r') as f:
-            data = json.load(f)
-            output_mapping[file.name] = map_json_structure(data)
+        tasks.append((file.name, map_json_file, file))
 
     # Spatial Analysis output
-    with open(results_dir / "spatial_analysis_results.json", 'r') as f:
-        data = json.load(f)
-        output_mapping["spatial_analysis_results.json"] = map_json_structure(data)
+    tasks.append(("spatial_analysis_results.json", map_json_file, results_dir / "spatial_analysis_results.json"))
 
     # Data Preparation for Spatial Charts outputs
     choropleth_dir = results_dir / "choropleth_data"
     for file in choropleth_dir.glob("*.csv"):
-        output_mapping[f"choropleth_data/{file.name}"] = map_csv_structure(file)
+        tasks.append((f"choropleth_data/{file.name}", map_csv_structure, file))
 
-    with open(results_dir / "spatial_weights" / "spatial_weights.json", 'r') as f:
-        data = json.load(f)
-        output_mapping["spatial_weights.json"] = map_json_structure(data)
+    tasks.append(("spatial_weights.json", map_json_file, results_dir / "spatial_weights" / "spatial_weights.json"))
 
     time_series_dir = results_dir / "time_series_data"
     for file in time_series_dir.glob("*.csv"):
-        output_mapping[f"time_series_data/{file.name}"] = map_csv_structure(file)
+        tasks.append((f"time_series_data/{file.name}", map_csv_structure, file))
 
     network_dir = results_dir / "network_data"
     for file in network_dir.glob("*.csv"):
-        output_mapping[f"network_data/{file.name}"] = map_csv_structure(file)
+        tasks.append((f"network_data/{file.name}", map_csv_structure, file))
+
+    # The files are independent and mostly disk-bound, so they are read on a thread pool;
+    # map() keeps the results in task order
+    with ThreadPoolExecutor(max_workers=min(8, len(tasks))) as executor:
+        structures = list(executor.map(lambda task: task[1](task[2]), tasks))
 
-    return output_mapping
+    return {key: structure for (key, _, _), structure in zip(tasks, structures)}
 
 if __name__ == "__main__":
     output_mapping = map_outputs()
@@ -0,0 +1,38 @@
+# Econometrics/csv_export.py
+
+try:
+    import pyarrow
+    import pyarrow.csv as pacsv
+except ImportError:  # fall back to DataFrame.to_csv
+    pyarrow = None
+    pacsv = None
+
+
+def write_csv(df, file_path):
+    """
+    Write a DataFrame to CSV with pyarrow's C++ writer, falling back to pandas.
+
+    The values match DataFrame.to_csv(index=False), but Arrow's 'needed' quoting
+    always quotes the header names and string values, which pandas leaves bare
+    unless they contain a delimiter or quote. CSV readers such as Papa Parse read
+    both forms the same way.
+
+    Parameters:
+        df (pd.DataFrame): The DataFrame to write.
+        file_path (str or Path): Destination CSV path.
+    """
+    if pacsv is None:
+        df.to_csv(file_path, index=False)
+        return
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        column = table.column(i)
+        if pyarrow.types.is_dictionary(field.type):
+            # Categorical columns are written as their plain values
+            table = table.set_column(i, field.name, column.cast(field.type.value_type))
+        elif pyarrow.types.is_timestamp(field.type):
+            dates = df[field.name].dropna()
+            # pandas writes midnight-only timestamps as plain dates; keep that format
+            if (dates == dates.dt.normalize()).all():
+                table = table.set_column(i, field.name, column.cast(pyarrow.date32()))
+    pacsv.write_csv(table, file_path, write_options=pacsv.WriteOptions(quoting_style='needed'))
@@ -0,0 +1,31 @@
+# Econometrics/json_io.py
+
+import json
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib json module
+    orjson = None
+
+
+def load_json_bytes(raw):
+    """
+    Parse JSON bytes with orjson when it is installed, falling back to the stdlib parser.
+
+    orjson only accepts strict RFC 8259 JSON and rejects the NaN/Infinity tokens that
+    json.dump writes by default (several of the analysis scripts write results that way).
+    Such files are parsed twice, once by orjson and once by json, so loading them is
+    slower than a plain json.loads.
+
+    Parameters:
+        raw (bytes): Contents of a JSON file.
+
+    Returns:
+        The parsed JSON value.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
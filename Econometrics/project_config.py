@@ -56,6 +56,9 @@ COINTEGRATION_SIGNIFICANCE_LEVEL = 0.05
 
 # ECM analysis parameters
 GRANGER_MAX_LAGS = 5
+# Store per-observation residuals and fitted values in the ECM results.
+# The dashboard's residual plot reads them; disable for faster batch runs.
+STORE_FULL_SERIES = True
 
 # Result file names
 ECM_RESULTS_FILE = RESULTS_DIR / "ecm_results.json"
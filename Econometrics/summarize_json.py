@@ -1,29 +1,197 @@
+import numpy as np
 import pandas as pd
-import json
 import argparse
 import os
+import sys
+import warnings
+from contextlib import redirect_stdout
+from io import StringIO
 from datetime import datetime
 
-def load_json(json_file_path):
+try:
+    import numba
+except ImportError:  # fall back to pandas' groupby aggregation
+    numba = None
+
+try:
+    import bottleneck
+except ImportError:  # fall back to DataFrame.describe
+    bottleneck = None
+
+from csv_export import write_csv
+from json_io import load_json_bytes
+
+# Columns identifying one commodity/regime/market series
+GROUP_KEYS = ['commodity', 'exchange_rate_regime', 'market_id']
+
+def load_json(json_file_path, columns=None):
     """
-    Load JSON data from a file into a pandas DataFrame.
+    Load JSON data from a file into a pandas DataFrame, sorted by group and date.
+    Newline-delimited files (.jsonl / .ndjson) are read in chunks.
     
     Parameters:
         json_file_path (str): Path to the JSON file.
+        columns (list): Optional columns to keep; all columns are loaded if None.
         
     Returns:
         pd.DataFrame: DataFrame containing the JSON data.
     """
     try:
-        with open(json_file_path, 'r') as file:
-            data = json.load(file)
-        df = pd.json_normalize(data)
+        if os.path.splitext(json_file_path)[1].lower() in ('.jsonl', '.ndjson'):
+            # Parsed chunk by chunk, so the raw records are never all held as Python objects
+            chunks = pd.read_json(json_file_path, lines=True, chunksize=100_000, convert_dates=False)
+            df = pd.concat((select_columns(chunk, columns) for chunk in chunks), ignore_index=True)
+        else:
+            with open(json_file_path, 'rb') as file:
+                data = load_json_bytes(file.read())
+            df = select_columns(pd.json_normalize(data), columns)
+            # Release the parsed records before the analyses run
+            del data
+        df = compact_dtypes(df)
+        # Parse dates once here; the analyses below all work on the parsed column
+        if 'date' in df.columns:
+            df['date'] = parse_dates(df['date'])
+        # Sort once so each group's rows (in date order) are contiguous; the groupings
+        # below then follow this order instead of sorting their keys again
+        if set(GROUP_KEYS).issubset(df.columns):
+            sort_columns = GROUP_KEYS + (['date'] if 'date' in df.columns else [])
+            df = df.sort_values(sort_columns, ignore_index=True)
         print(f"JSON data successfully loaded. Total records: {len(df)}")
         return df
     except Exception as e:
         print(f"Error loading JSON file: {e}")
         return None
 
+def select_columns(df, columns):
+    """
+    Keep only the requested columns that are present in the DataFrame.
+    
+    Parameters:
+        df (pd.DataFrame): Loaded data.
+        columns (list): Columns to keep, or None to keep all.
+        
+    Returns:
+        pd.DataFrame: The projected DataFrame.
+    """
+    if columns is None:
+        return df
+    return df[[col for col in columns if col in df.columns]]
+
+def parse_dates(dates):
+    """
+    Parse a date column; values that are not ISO 8601 dates become NaT.
+    
+    Parameters:
+        dates (pd.Series): Raw date values.
+        
+    Returns:
+        pd.Series: datetime64 Series.
+    """
+    # An explicit format skips pandas' per-call format inference, and the cache parses
+    # each distinct date string (dates repeat across every group) only once
+    return pd.to_datetime(dates, errors='coerce', format='ISO8601', cache=True)
+
+def compact_dtypes(df):
+    """
+    Shrink column dtypes after loading: integers are downcast, floats become float32
+    where that loses nothing, and non-numeric group keys become categoricals.
+    
+    Parameters:
+        df (pd.DataFrame): The loaded DataFrame.
+        
+    Returns:
+        pd.DataFrame: The same DataFrame with compacted columns.
+    """
+    for col in df.select_dtypes(include=['integer']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes(include=['floating']).columns:
+        as_float32 = df[col].astype(np.float32)
+        if np.array_equal(as_float32.to_numpy(dtype=np.float64), df[col].to_numpy(dtype=np.float64), equal_nan=True):
+            df[col] = as_float32
+    # Categorical keys give every groupby their codes directly instead of hashing the strings;
+    # numeric keys (e.g. integer market ids) already group quickly and stay in the statistics
+    for col in GROUP_KEYS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype('category')
+    return df
+
+def _date_range_kernel(codes, values, n_groups):
+    # Single pass computing min, max and count of the int64 date values per group code;
+    # rows without a group (code -1) or with NaT (int64 minimum) are skipped
+    nat = np.iinfo(np.int64).min
+    out_min = np.full(n_groups, np.iinfo(np.int64).max, dtype=np.int64)
+    out_max = np.full(n_groups, nat, dtype=np.int64)
+    counts = np.zeros(n_groups, dtype=np.int64)
+    for i in range(codes.shape[0]):
+        code = codes[i]
+        value = values[i]
+        if code < 0 or value == nat:
+            continue
+        counts[code] += 1
+        if value < out_min[code]:
+            out_min[code] = value
+        if value > out_max[code]:
+            out_max[code] = value
+    for code in range(n_groups):
+        if counts[code] == 0:
+            out_min[code] = nat
+    return out_min, out_max, counts
+
+if numba is not None:
+    _date_range_kernel = numba.njit(cache=True)(_date_range_kernel)
+
+def group_date_range(grouped, dates):
+    """
+    Compute the earliest date, latest date and number of valid dates per group.
+    
+    Parameters:
+        grouped (DataFrameGroupBy): Grouping of the rows that dates belongs to.
+        dates (pd.Series): datetime64 column of the grouped DataFrame.
+        
+    Returns:
+        pd.DataFrame: 'min', 'max' and 'count' columns indexed by group.
+    """
+    date_values = dates.to_numpy()
+    if numba is None or date_values.dtype.kind != 'M':
+        return grouped['date'].agg(['min', 'max', 'count'])
+    
+    # Group numbers follow the order of the grouped results; rows dropped from the grouping are -1
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    group_index = grouped.size().index
+    out_min, out_max, counts = _date_range_kernel(codes, date_values.view(np.int64), len(group_index))
+    return pd.DataFrame({
+        'min': out_min.view(date_values.dtype),
+        'max': out_max.view(date_values.dtype),
+        'count': counts
+    }, index=group_index)
+
+def _require(df, required_columns):
+    # Report the first required column the DataFrame lacks; the column labels are
+    # put in a set once so each check is a hash lookup
+    present = set(df.columns)
+    for col in required_columns:
+        if col not in present:
+            print(f"Missing required column: {col}")
+            return False
+    return True
+
+def format_frame(df, max_rows=60, min_rows=10, max_cols=10):
+    """
+    Render a DataFrame for the report like print(df) under pandas' default display options.
+    
+    Parameters:
+        df (pd.DataFrame): The DataFrame to render.
+        max_rows (int): Tables longer than this are truncated to their head and tail.
+        min_rows (int): Rows shown (head and tail together) once a table is truncated.
+        max_cols (int): Columns shown before the output is truncated.
+        
+    Returns:
+        str: The rendered table.
+    """
+    # Per-group tables have one row per commodity/regime/market; the explicit limits keep
+    # their formatting cost bounded regardless of the pandas display options
+    return df.to_string(max_rows=max_rows, min_rows=min_rows, max_cols=max_cols, show_dimensions='truncate')
+
 def basic_overview(df):
     """
     Provide a basic overview of the DataFrame.
@@ -39,75 +207,109 @@ def basic_overview(df):
     print("\nMissing Values per Column:")
     print(df.isnull().sum())
 
-def group_summary(df):
+def group_summary(df, group_sizes=None):
     """
     Summarize data based on commodity, exchange_rate_regime, and market_id.
     
     Parameters:
         df (pd.DataFrame): The DataFrame to summarize.
+        group_sizes (pd.Series): Optional record count per GROUP_KEYS combination to reuse.
     """
     print("\n--- Group-wise Summary ---")
     
     # Ensure 'commodity', 'exchange_rate_regime', and 'market_id' columns exist
     required_columns = ['commodity', 'exchange_rate_regime', 'market_id']
-    for col in required_columns:
-        if col not in df.columns:
-            print(f"Missing required column: {col}")
-            return
+    if not _require(df, required_columns):
+        return
     
-    # Number of unique values
-    print(f"\nUnique Commodities: {df['commodity'].nunique()}")
-    print(f"Unique Exchange Rate Regimes: {df['exchange_rate_regime'].nunique()}")
-    print(f"Unique Markets: {df['market_id'].nunique()}")
+    # Number of unique values (a categorical column's categories are exactly its distinct values)
+    n_unique = {
+        col: len(df[col].cat.categories) if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].nunique()
+        for col in required_columns
+    }
+    print(f"\nUnique Commodities: {n_unique['commodity']}")
+    print(f"Unique Exchange Rate Regimes: {n_unique['exchange_rate_regime']}")
+    print(f"Unique Markets: {n_unique['market_id']}")
+    
+    # Counts are listed by count, ties by key, so the order doesn't depend on row order.
+    # Counts of a categorical key are the marginals of one count per key combination
+    # (already in key order); other keys, and frames where rows with a missing key would
+    # drop out of the grouping, use value_counts
+    keys_complete = df[required_columns].notna().all().all()
+    if keys_complete and group_sizes is None:
+        if any(isinstance(df[col].dtype, pd.CategoricalDtype) for col in required_columns):
+            group_sizes = df.groupby(required_columns, observed=True).size()
+    def record_counts(col):
+        if keys_complete and isinstance(df[col].dtype, pd.CategoricalDtype):
+            counts = group_sizes.groupby(level=col, observed=True).sum().rename('count')
+        else:
+            counts = df[col].value_counts().sort_index()
+        return counts.sort_values(ascending=False, kind='stable')
     
     # Counts per Commodity
     print("\nNumber of Records per Commodity:")
-    print(df['commodity'].value_counts())
+    print(record_counts('commodity'))
     
     # Counts per Exchange Rate Regime
     print("\nNumber of Records per Exchange Rate Regime:")
-    print(df['exchange_rate_regime'].value_counts())
+    print(record_counts('exchange_rate_regime'))
     
     # Counts per Market
     print("\nNumber of Records per Market:")
-    print(df['market_id'].value_counts())
+    print(record_counts('market_id'))
 
-def date_analysis(df):
+def date_analysis(df, grouped=None):
     """
     Analyze date ranges and check for duplicate dates within each group.
     
     Parameters:
         df (pd.DataFrame): The DataFrame to analyze.
+        grouped (DataFrameGroupBy): Optional groupby of df on GROUP_KEYS to reuse.
+        
+    Returns:
+        pd.DataFrame: Start date, end date and number of valid dates per group.
     """
     print("\n--- Date Range and Duplication Analysis ---")
     
     # Ensure 'date' column exists
     if 'date' not in df.columns:
         print("Missing 'date' column in the DataFrame.")
-        return
+        return None
+    if not _require(df, GROUP_KEYS):
+        return None
     
     # Convert 'date' to datetime
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    if not pd.api.types.is_datetime64_any_dtype(df['date']):
+        df['date'] = parse_dates(df['date'])
     invalid_dates = df['date'].isnull().sum()
     if invalid_dates > 0:
         print(f"\nWarning: {invalid_dates} invalid dates found and will be excluded from date analysis.")
     
-    # Drop rows with invalid dates for date analysis
-    df_valid_dates = df.dropna(subset=['date'])
-    
     # Group by commodity, exchange_rate_regime, and market_id
-    grouped = df_valid_dates.groupby(['commodity', 'exchange_rate_regime', 'market_id'])
+    if grouped is None:
+        grouped = df.groupby(GROUP_KEYS, observed=True)
     
-    date_summary = grouped['date'].agg(['min', 'max', 'count']).reset_index()
+    # Invalid dates are skipped by min/max/count; groups without any valid date are dropped
+    date_stats = group_date_range(grouped, df['date'])
+    has_dates = date_stats['count'].to_numpy() > 0
+    date_summary = date_stats[has_dates].reset_index()
     date_summary.rename(columns={'min': 'Start Date', 'max': 'End Date', 'count': 'Total Dates'}, inplace=True)
     
     print("\nDate Range per Group:")
-    print(date_summary)
+    print(format_frame(date_summary))
     
     # Check for duplicate dates within each group
-    duplicates = grouped['date'].apply(lambda x: x.duplicated().sum()).reset_index(name='Duplicate Dates')
+    # (a valid date seen earlier in the same group), flagged for all rows in one vectorized pass
+    duplicated = (df.duplicated(subset=GROUP_KEYS + ['date'], keep='first') & df['date'].notna()).to_numpy()
+    # Summed per group with one bincount over the group numbers; rows outside the grouping are -1
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    in_group = codes >= 0
+    counts = np.bincount(codes[in_group], weights=duplicated[in_group], minlength=len(date_stats)).astype(np.int64)
+    duplicates = pd.Series(counts, index=date_stats.index)[has_dates].reset_index(name='Duplicate Dates')
     print("\nDuplicate Dates per Group:")
-    print(duplicates)
+    print(format_frame(duplicates))
+    
+    return date_summary
     
 def statistical_summary(df):
     """
@@ -124,38 +326,76 @@ def statistical_summary(df):
         print("No numerical columns found for statistical summary.")
         return
     
-    stats = df[numerical_cols].describe()
+    stats = describe_numeric(df[numerical_cols])
     print(stats)
 
-def group_records(df, min_common_dates=30):
+def describe_numeric(numeric_df):
+    """
+    Compute the statistics of DataFrame.describe() for numerical columns, using
+    bottleneck's NaN-aware reductions when it is installed.
+    
+    Parameters:
+        numeric_df (pd.DataFrame): DataFrame of numerical columns only.
+        
+    Returns:
+        pd.DataFrame: count, mean, std, min, quartiles and max per column.
+    """
+    # compact_dtypes stores some columns as float32; describe them in float64 so the
+    # accumulated mean and std match those of the original float64 data
+    float32_cols = numeric_df.select_dtypes(include=[np.float32]).columns
+    if len(float32_cols):
+        numeric_df = numeric_df.astype({col: np.float64 for col in float32_cols})
+    if bottleneck is None:
+        return numeric_df.describe()
+    
+    values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+    with warnings.catch_warnings():
+        # Columns with no (or a single) valid value give NaN statistics, as in describe()
+        warnings.simplefilter('ignore', RuntimeWarning)
+        quartiles = np.nanpercentile(values, [25, 50, 75], axis=0)
+        stats = {
+            'count': np.sum(~np.isnan(values), axis=0).astype(np.float64),
+            'mean': bottleneck.nanmean(values, axis=0),
+            'std': bottleneck.nanstd(values, axis=0, ddof=1),
+            'min': bottleneck.nanmin(values, axis=0),
+            '25%': quartiles[0],
+            '50%': quartiles[1],
+            '75%': quartiles[2],
+            'max': bottleneck.nanmax(values, axis=0),
+        }
+    return pd.DataFrame(stats, index=numeric_df.columns).T
+
+def group_records(df, min_common_dates=30, grouped=None, group_sizes=None):
     """
     Identify how many records per group and check for sufficient dates.
     
     Parameters:
         df (pd.DataFrame): The DataFrame to analyze.
         min_common_dates (int): Minimum number of common dates required.
+        grouped (DataFrameGroupBy): Optional groupby of df on GROUP_KEYS to reuse.
+        group_sizes (pd.Series): Optional record count per GROUP_KEYS combination to reuse.
     """
     print("\n--- Group Records Analysis ---")
     
     # Ensure required columns exist
-    required_columns = ['commodity', 'exchange_rate_regime', 'market_id']
-    for col in required_columns:
-        if col not in df.columns:
-            print(f"Missing required column: {col}")
-            return
+    if not _require(df, GROUP_KEYS):
+        return
     
     # Group by commodity, regime, and market
-    grouped = df.groupby(['commodity', 'exchange_rate_regime', 'market_id'])
+    if group_sizes is None:
+        if grouped is None:
+            grouped = df.groupby(GROUP_KEYS, observed=True)
+        group_sizes = grouped.size()
     
-    group_counts = grouped.size().reset_index(name='Record Count')
+    group_counts = group_sizes.reset_index(name='Record Count')
     print("\nNumber of Records per Group:")
-    print(group_counts)
+    print(format_frame(group_counts))
     
     # Identify groups with insufficient dates
     insufficient = group_counts[group_counts['Record Count'] < min_common_dates]
     if not insufficient.empty:
         print(f"\nGroups with fewer than {min_common_dates} records:")
-        print(insufficient)
+        print(format_frame(insufficient))
     else:
         print(f"\nAll groups have at least {min_common_dates} records.")
 
@@ -171,7 +411,7 @@ def export_summary(df, output_dir, filename):
     try:
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, filename)
-        df.to_csv(output_path, index=False)
+        write_csv(df, output_path)
         print(f"\nSummary successfully exported to {output_path}")
     except Exception as e:
         print(f"Error exporting summary: {e}")
@@ -182,42 +422,58 @@ def main():
     parser.add_argument('json_file', type=str, help='Path to the JSON file to summarize.')
     parser.add_argument('--output_dir', type=str, default='summaries', help='Directory to save summary files.')
     parser.add_argument('--output_file', type=str, default='summary.csv', help='Filename for the summary export.')
+    parser.add_argument('--columns', type=str, nargs='+', default=None,
+                        help='Only load these columns (e.g. commodity exchange_rate_regime market_id date usdprice).')
     
     args = parser.parse_args()
     
+    # Collect the report in memory and write it out in one go instead of flushing every print
+    buffer = StringIO()
+    try:
+        with redirect_stdout(buffer):
+            run_summary(args)
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
+
+def run_summary(args):
+    """
+    Run all analyses on the JSON file and export the date range summary.
+    
+    Parameters:
+        args (argparse.Namespace): Parsed command-line arguments.
+    """
     # Load JSON data
-    df = load_json(args.json_file)
+    df = load_json(args.json_file, columns=args.columns)
     if df is None:
         return
     
     # Basic overview
     basic_overview(df)
     
+    # Build the commodity/regime/market grouping and its record counts once and share
+    # them between the analyses
+    grouped = None
+    group_sizes = None
+    if set(GROUP_KEYS).issubset(df.columns):
+        # load_json has already sorted the rows by these keys
+        grouped = df.groupby(GROUP_KEYS, observed=True, sort=False)
+        group_sizes = grouped.size()
+    
     # Group-wise summary
-    group_summary(df)
+    group_summary(df, group_sizes=group_sizes)
     
     # Date analysis
-    date_analysis(df)
+    date_summary = date_analysis(df, grouped=grouped)
     
     # Statistical summary
     statistical_summary(df)
     
     # Group records analysis
-    group_records(df, min_common_dates=30)
-    
-    # Optional: Export summary (e.g., date_summary)
-    # You can modify this part based on what summaries you want to export
-    # For demonstration, let's export the date range summary
-    
-    # Convert 'date' to datetime and drop invalid dates for export
-    if 'date' in df.columns:
-        df['date'] = pd.to_datetime(df['date'], errors='coerce')
-        df_valid_dates = df.dropna(subset=['date'])
-        grouped = df_valid_dates.groupby(['commodity', 'exchange_rate_regime', 'market_id'])
-        date_summary = grouped['date'].agg(['min', 'max', 'count']).reset_index()
-        date_summary.rename(columns={'min': 'Start Date', 'max': 'End Date', 'count': 'Total Dates'}, inplace=True)
-        
-        # Export date summary
+    group_records(df, min_common_dates=30, grouped=grouped, group_sizes=group_sizes)
+    
+    # Export the date range summary computed by date_analysis
+    if date_summary is not None:
         export_summary(date_summary, args.output_dir, 'date_summary.csv')
     
     print("\n--- Summary Complete ---")